@@ -2,7 +2,6 @@ import re
 
 
 class MOM6InputParser(object):
-    header_pattern = re.compile(r"^! === (.+) ===")
     block_list = [
         "KPP%",
         "%KPP",
@@ -11,36 +10,48 @@ class MOM6InputParser(object):
         "CVMIX_DDIFF%",
         "%CVMIX_DDIFF",
     ]
+    _block_set = frozenset(block_list)
 
     def __init__(self):
         self.param_dict = {}
         self.commt_dict = {}
         self.current_var = None
-        self.current_value = []
+        self.current_value = ""
         self.current_comment = []
-        self.block_pattern = re.compile(r"|".join(re.escape(i) for i in self.block_list))
+        # classify all the lines of the file with a single multi-line regex: the alternatives are tried in order, so
+        # that, e.g., a header is never mistaken for a comment and a line containing "=" is always a parameter. Each
+        # alternative matches a whole line and lines matching none of them are skipped.
+        self.line_pattern = re.compile(
+            r"^(?:"
+            r"(?P<header>! === .+ ===.*)"
+            r"|(?P<comment>[^\S\n]*!.*)"
+            r"|(?P<assign>[^=\n]*=.*)"
+            r"|(?P<block>.*?(?:" + r"|".join(re.escape(i) for i in self.block_list) + r").*)"
+            r")$",
+            re.MULTILINE,
+        )
 
     def read_input(self, MOM_input_read_path):
-        with open(MOM_input_read_path, "r") as f:
-            self.lines = f.readlines()
+        # the file is only read when parsing
+        self._path = MOM_input_read_path
 
     def parse_lines(self):
-        for line in self.lines:
-            if self.header_pattern.match(line):
-                self._save_current_param()
-                self._start_new_header()
-                continue
+        with open(self._path, "r") as f:
+            text = f.read()
 
-            if line.strip().startswith("!"):
+        for match in self.line_pattern.finditer(text):
+            line = match.group()
+            kind = match.lastgroup
+            if kind == "comment":
                 self._append_comments(line)
                 continue
 
-            if "=" in line:
-                self._save_current_param()
+            self._save_current_param()
+            if kind == "header":
+                self._start_new_header()
+            elif kind == "assign":
                 self._parse_params(line)
-
-            elif self.block_pattern.search(line):  # block_pattern
-                self._save_current_param()
+            else:  # block
                 self._parse_params_block(line)
 
         # last parameter
@@ -50,29 +61,30 @@ class MOM6InputParser(object):
         # save parameters, and associated values and comments
         if self.current_var:
             var_name = self.current_var
-            value = "".join(self.current_value).strip()
+            value = self.current_value
             comment = "\n".join(self.current_comment).strip()
             self.param_dict[var_name] = value
             self.commt_dict[var_name] = comment
 
     def _start_new_header(self):
         self.current_var = None
-        self.current_value = []
+        self.current_value = ""
         self.current_comment = []
 
     def _parse_params(self, line):
-        param, value = line.split("=", 1)
+        param, _, value = line.partition("=")
         param = param.strip()
         # separate value and inline comment
-        tmp_value = value.split("!")[0].strip()  # value
-        tmp_commt = value.split("!")[1].strip() if "!" in value else ""  # inline comment
+        value, sep, commt = value.partition("!")
+        tmp_value = value.strip()  # value
+        tmp_commt = commt.strip() if sep else ""  # inline comment
         self.current_var = param
-        self.current_value = [tmp_value]
+        self.current_value = tmp_value
         self.current_comment = [tmp_commt]
 
     def _parse_params_block(self, line):
         self.current_var = line.strip()
-        self.current_value = [""]
+        self.current_value = ""
         self.current_comment = [""]
 
     def _append_comments(self, line):
@@ -83,20 +95,24 @@ class MOM6InputParser(object):
         """
         Write the updated MOM_input to file
         """
+        parts = [
+            "! This file was written by the script xxx \n",
+            "! and records the non-default parameters used at run-time.\n",
+            "\n",
+        ]
+        for var, value in self.param_dict.items():
+            comment = self.commt_dict.get(var, "")
+            if comment:
+                comment_lines = comment.split("\n")
+                param_str = f"{var} = {value}"
+                parts.append(f"{param_str:<{total_width}} ! {comment_lines[0].strip()}\n")
+                for comment_line in comment_lines[1:]:
+                    parts.append(f"{'':<{total_width}} {comment_line.strip()}\n")
+            elif var in self._block_set:
+                parts.append(f"{var}\n")
+            else:
+                parts.append(f"{var} = {value}\n")
+        parts.append("\n")
+
         with open(MOM_input_write_path, "w") as f:
-            f.write("! This file was written by the script xxx \n")
-            f.write("! and records the non-default parameters used at run-time.\n")
-            f.write("\n")
-            for var, value in self.param_dict.items():
-                comment = self.commt_dict.get(var, "")
-                if comment:
-                    comment_lines = comment.split("\n")
-                    param_str = f"{var} = {value}"
-                    f.write(f"{param_str:<{total_width}} ! {comment_lines[0].strip()}\n")
-                    for comment_line in comment_lines[1:]:
-                        f.write(f"{'':<{total_width}} {comment_line.strip()}\n")
-                elif var in self.block_list:
-                    f.write(f"{var}\n")
-                else:
-                    f.write(f"{var} = {value}\n")
-            f.write("\n")
+            f.write("".join(parts))
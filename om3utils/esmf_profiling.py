@@ -2,8 +2,11 @@
 
 from pathlib import Path
 
+import numpy as np
+
 from om3utils.profiling import ProfilingParser
 from om3utils.esmf_trace import ESMFTrace, MultiPETTimingNode
+from om3utils.utils import nano_to_sec
 
 
 class ESMFProfilingParser(ProfilingParser):
@@ -14,12 +17,22 @@ class ESMFProfilingParser(ProfilingParser):
     region.
     """
 
-    def __init__(self, dirname):
+    def __init__(self, dirname, use_cache: bool = False, max_workers: int = 1):
+        """
+
+        Args:
+            dirname (str): Name of the directory containing the traces, relative to the path given to read.
+            use_cache (bool): Cache the parsed traces, so that they are not parsed again if read a second time.
+            max_workers (int): Maximum number of processes used to read the traces in parallel. If None, it defaults to
+                the number of processors.
+        """
         super().__init__()
 
         # ESMF provides the following metrics:
         self._metrics = ["hits", "tmin", "tmax", "tavg", "ttot"]
         self._dirname = dirname
+        self._use_cache = use_cache
+        self._max_workers = max_workers
 
     @property
     def metrics(self) -> list:
@@ -38,31 +51,43 @@ class ESMFProfilingParser(ProfilingParser):
         if not profiling_dir.is_dir():
             raise FileNotFoundError(f"Directory not found: {profiling_dir.as_posix()}")
 
-        trace = ESMFTrace(profiling_dir)
+        trace = ESMFTrace(profiling_dir, use_cache=self._use_cache, max_workers=self._max_workers)
 
+        # Hits are integer counts, while all the other metrics are timings
         stats = {"region": trace.regions}
-        stats.update({key: [0] * len(trace.regions) for key in self.metrics})
+        stats.update(
+            {key: np.zeros(len(trace.regions), dtype=np.int64 if key == "hits" else np.float64) for key in self.metrics}
+        )
+
+        region_index = {name: index for index, name in enumerate(stats["region"])}
+        self._add_tree_stats(trace.multiPETTree, region_index, stats)
 
-        for name, child in trace.multiPETTree.children.items():
-            self._add_node_stats(child, name, stats)
+        # Timings are accumulated in nanoseconds and converted to seconds in one go
+        for key in ["tmin", "tmax", "tavg", "ttot"]:
+            stats[key] = nano_to_sec(stats[key])
 
         return stats
 
-    def _add_node_stats(self, node: MultiPETTimingNode, name: str, stats: dict):
-        """For a given timing node, compute and collect the relevant statistics (e.g. the total time spent in a region).
-        Once done, do the same for each node child, such that we traverse the whole timing tree.
+    def _add_tree_stats(self, tree: MultiPETTimingNode, region_index: dict, stats: dict):
+        """For each node of a timing tree, compute and collect the relevant statistics (e.g. the total time spent in a
+        region). Timings are collected in nanoseconds.
+
+        The tree is traversed iteratively instead of recursively, so that deep trees cannot exceed the maximum recursion
+        depth.
 
         Args:
-            node (MultiPETTimingNode): Timing node.
-            name (str): Name of the region.
+            tree (MultiPETTimingNode): Root of the timing tree.
+            region_index (dict): Index of each region in the statistics arrays.
             stats(dict): Profiling statistics.
         """
-        index = stats["region"].index(name)
-        stats["hits"][index] += node.count_each
-        stats["tmin"][index] += node.total_min_s
-        stats["tmax"][index] += node.total_max_s
-        stats["tavg"][index] += node.total_mean_s
-        stats["ttot"][index] += node.total_sum_s
-
-        for name, child in node.children.items():
-            self._add_node_stats(child, name, stats)
+        stack = list(tree.children.items())
+        while stack:
+            name, node = stack.pop()
+            index = region_index[name]
+            stats["hits"][index] += node.count_each
+            stats["tmin"][index] += node.total_min
+            stats["tmax"][index] += node.total_max
+            stats["tavg"][index] += node.total_mean
+            stats["ttot"][index] += node.total_sum
+
+            stack.extend(node.children.items())
@@ -8,13 +8,24 @@ bindings.
 Note that most of the contents of this file are based on the code from esmf-profiler (https://github.com/esmf-org/esmf-profiler).
 """
 
+import hashlib
+import os
+import pickle
 import sys
+import tempfile
+import warnings
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import bt2
 
+from om3utils import __version__
 from om3utils.utils import nano_to_sec
 
+# Version of the layout of the cached traces. This must be increased whenever the classes stored in the cache change.
+_TRACE_CACHE_VERSION = 4
+
 
 class SinglePETTimingNode:
     """Representation of a single PET timing node in a tree of profiling events.
@@ -26,6 +37,8 @@ class SinglePETTimingNode:
     This allows to efficiently append a new node to the tree.
     """
 
+    __slots__ = ("_id", "_pet", "_name", "_total", "_min", "_max", "_mean", "_count", "_children", "_child_cache")
+
     def __init__(self, _id: int, pet: int, name: str):
         """
 
@@ -128,6 +141,109 @@ class SinglePETTimingNode:
         return True
 
 
+class SinglePETTiming:
+    """Timing information of all the profiling regions of a single PET, stored as a structure of arrays.
+
+    This holds the same information as a tree of SinglePETTimingNodes, but instead of one object per region, each
+    quantity is stored in a typed array indexed by the position of the region in the tree. This greatly reduces the
+    memory footprint when parsing traces with many PETs and regions. The tree structure is kept by storing the position
+    of the parent and of the direct children of each region. The root of the tree (region ID 0) is always at position 0.
+
+    Note that, as the timings recorded by ESMF are integer numbers of nanoseconds, so are the values stored here.
+    """
+
+    __slots__ = ("_pet", "_positions", "_names", "_parents", "_totals", "_counts", "_mins", "_maxs", "_children")
+
+    def __init__(self, pet: int):
+        """
+
+        Args:
+            pet (int): PET number.
+        """
+        self._pet = pet
+        self._positions = {0: 0}  # region ID -> position in the arrays
+        self._names = ["TOP_LEVEL"]
+        self._parents = array("q", [-1])
+        self._totals = array("q", [0])
+        self._counts = array("q", [0])
+        self._mins = array("q", [sys.maxsize])
+        self._maxs = array("q", [0])
+        self._children = [[]]  # positions of the children that have each region as direct parent
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def pet(self):
+        """int: PET number."""
+        return self._pet
+
+    @property
+    def names(self):
+        """list[str]: Names of the profiling regions."""
+        return self._names
+
+    @property
+    def parents(self):
+        """array: Position of the parent of each region (-1 for the root)."""
+        return self._parents
+
+    @property
+    def totals(self):
+        """array: Total time spent in each region, in nanoseconds."""
+        return self._totals
+
+    @property
+    def counts(self):
+        """array: Number of times each region was executed."""
+        return self._counts
+
+    @property
+    def mins(self):
+        """array: Minimum time spent in each region, in nanoseconds."""
+        return self._mins
+
+    @property
+    def maxs(self):
+        """array: Maximum time spent in each region, in nanoseconds."""
+        return self._maxs
+
+    def children(self, position: int) -> list[int]:
+        """Positions of the regions that have the region at the given position as direct parent.
+
+        Args:
+            position (int): Position of the parent region.
+
+        Returns:
+            list[int]: Positions of the children.
+        """
+        return self._children[position]
+
+    def add_region(self, _id: int, parentid: int, name: str, total: int, count: int, _min: int, _max: int):
+        """Add the timings of a region as a child of the region with given parentid.
+
+        Args:
+            _id (int): Region ID.
+            parentid (int): Parent region ID. The parent must have been added before.
+            name (str): Region name.
+            total (int): Total time spent in the region, in nanoseconds.
+            count (int): Number of times this region was executed.
+            _min (int): Minimum time spent in the region, in nanoseconds.
+            _max (int): Maximum time spent in the region, in nanoseconds.
+        """
+        parent = self._positions[parentid]
+        position = len(self._names)
+        self._positions[_id] = position
+        self._names.append(name)
+        self._parents.append(parent)
+        self._totals.append(total)
+        self._counts.append(count)
+        self._mins.append(_min)
+        self._maxs.append(_max)
+        self._children.append([])
+        self._children[parent].append(position)
+
+
 class MultiPETTimingNode:
     """Representation of a multi-PET timing node in a tree of profiling events.
 
@@ -136,6 +252,18 @@ class MultiPETTimingNode:
     is merged into the multi-PET tree.
     """
 
+    __slots__ = (
+        "_children",
+        "_pet_count",
+        "_count_each",
+        "_counts_match",
+        "_total_sum",
+        "_total_min",
+        "_total_min_pet",
+        "_total_max",
+        "_total_max_pet",
+    )
+
     def __init__(self):
         self._children: dict[str, MultiPETTimingNode] = (
             {}
@@ -148,7 +276,6 @@ class MultiPETTimingNode:
         self._total_min_pet = -1  # PET with min total
         self._total_max = 0  # max of all totals
         self._total_max_pet = -1  # PET with max total
-        self._contributing_nodes = {}  # map of contributing SinglePETTimingNodes (key = PET)
 
     @property
     def pet_count(self):
@@ -224,10 +351,28 @@ class MultiPETTimingNode:
         return self._children
 
     def _merge_children(self, other: SinglePETTimingNode):
+        children = self._children
         for c in other.children:
-            rs = self._children.setdefault(c.name, MultiPETTimingNode())
+            rs = children.get(c.name)
+            if rs is None:
+                rs = children[c.name] = MultiPETTimingNode()
             rs.merge(c)
 
+    def _update_stats(self, pet: int, count: int, total: int, _min: int, _max: int):
+        self._pet_count += 1
+        if self._pet_count == 1:
+            self._count_each = count
+        elif self._count_each != count:
+            self._counts_match = False
+
+        self._total_sum += total
+        if self._total_min > _min:
+            self._total_min = _min
+            self._total_min_pet = pet
+        if self._total_max < _max:
+            self._total_max = _max
+            self._total_max_pet = pet
+
     def merge(self, other: SinglePETTimingNode):
         """Merge a single-PET tree into this multi-PET timing tree.
 
@@ -238,85 +383,232 @@ class MultiPETTimingNode:
         Args:
             other (SinglePETTimingNode): Single-PET tree to merge.
         """
-        self._pet_count += 1
-        if self._pet_count == 1:
-            self._count_each = other.count
-        elif self._count_each != other.count:
-            self._counts_match = False
+        self._update_stats(other.pet, other.count, other.total, other.min, other.max)
 
-        self._total_sum += other.total
-        if self._total_min > other.min:
-            self._total_min = other.min
-            self._total_min_pet = other.pet
-        if self._total_max < other.max:
-            self._total_max = other.max
-            self._total_max_pet = other.pet
+        self._merge_children(other)
 
-        self._contributing_nodes[other.pet] = other
+    def merge_timing(self, timing: SinglePETTiming, position: int = 0):
+        """Merge the timings of a single PET into this multi-PET timing tree.
 
-        self._merge_children(other)
+        This is the equivalent of self.merge for timings stored as a SinglePETTiming instead of a tree of
+        SinglePETTimingNodes. The region at the given position is merged into this node, followed by all of its children.
 
+        Args:
+            timing (SinglePETTiming): Single-PET timings to merge.
+            position (int): Position of the region to merge into this node. Defaults to the root of the tree.
+        """
+        self._update_stats(
+            timing.pet, timing.counts[position], timing.totals[position], timing.mins[position], timing.maxs[position]
+        )
 
-class ESMFTrace:
-    """Tree of MultiPetTimingNodes constructed by parsing the traces generated by ESMF.
+        children = self._children
+        names = timing.names
+        for child in timing.children(position):
+            rs = children.get(names[child])
+            if rs is None:
+                rs = children[names[child]] = MultiPETTimingNode()
+            rs.merge_timing(timing, child)
+
+
+def _trace_cache_file(path: Path) -> Path:
+    """Name of the file used to cache the parsed contents of the traces stored in a given directory.
 
     Args:
-        path (str): Directory containing the traces to parse.
+        path (Path): Directory containing the traces.
+
+    Returns:
+        Path: Cache file.
     """
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "om3utils"
+    key = hashlib.sha256(path.resolve().as_posix().encode()).hexdigest()
+    return cache_dir / f"esmf_trace_{key}.pkl"
 
-    def __init__(self, path: Path):
-        self._region_id_to_name_map = {}  # { pet -> { region_id -> region name } }
-        self._timing_trees = {}  # { pet -> root of timing tree }
-        self._regions = {"TOP"}  # Set containing all known regions. Using a set ensures region's names are unique.
 
-        # Iterate over the trace messages.
+def _trace_signature(path: Path) -> tuple:
+    """Signature of the traces stored in a given directory, such that it changes whenever any of the files is modified.
+
+    The signature also includes the version of the cache layout and of the package, so that caches written by a
+    different version are not used.
+
+    Args:
+        path (Path): Directory containing the traces.
+
+    Returns:
+        tuple: Cache and package versions, followed by the name, size and modification time of all the files in the
+            directory.
+    """
+    files = sorted(p for p in path.rglob("*") if p.is_file())
+    return (_TRACE_CACHE_VERSION, __version__) + tuple(
+        (p.relative_to(path).as_posix(), p.stat().st_size, p.stat().st_mtime_ns) for p in files
+    )
+
+
+def _load_trace_cache(cache_file: Path, signature: tuple):
+    """Load the parsed traces from a cache file.
+
+    Args:
+        cache_file (Path): Cache file.
+        signature (tuple): Signature of the traces.
+
+    Returns:
+        dict: State of the ESMFTrace stored in the cache, or None if the cache is missing, outdated or unreadable.
+    """
+    if not cache_file.is_file():
+        return None
+    try:
+        with open(cache_file, "rb") as f:
+            cached_signature, state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError):
+        # Unreadable or damaged cache, or cache written with a different layout of the classes: treat it as a cache miss
+        return None
+    return state if cached_signature == signature else None
+
+
+def _write_trace_cache(cache_file: Path, signature: tuple, state: dict):
+    """Store the parsed traces in a cache file.
+
+    The cache is first written to a temporary file in the same directory, which is then moved into place, so that an
+    interrupted or concurrent write never leaves a partially written cache file behind. As the cache is only an
+    optimization, failing to write it (e.g. because the cache directory is read-only) only issues a warning.
+
+    Args:
+        cache_file (Path): Cache file.
+        signature (tuple): Signature of the traces.
+        state (dict): State of the ESMFTrace to store.
+    """
+    tmp_file = None
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=cache_file.parent, prefix=cache_file.name, suffix=".tmp", delete=False
+        ) as f:
+            tmp_file = Path(f.name)
+            pickle.dump((signature, state), f)
+        os.replace(tmp_file, cache_file)
+        tmp_file = None
+    except OSError as e:
+        warnings.warn(f"Unable to write trace cache file {cache_file}: {e}")
+    finally:
+        # Never leave a temporary file behind
+        if tmp_file is not None:
+            tmp_file.unlink(missing_ok=True)
+
+
+class _TraceReader:
+    """Reader of a single CTF trace, storing the timings of each PET found in the trace."""
+
+    def __init__(self):
+        self.region_id_to_name_map = {}  # { pet -> { region_id -> region name } }
+        self.timings = {}  # { pet -> SinglePETTiming }
+        self.regions = {"TOP"}  # Set containing all known regions. Using a set ensures region's names are unique.
+
+    def read(self, path: Path):
+        """Iterate over all the trace messages.
+
+        Args:
+            path (Path): Directory containing the trace to read.
+        """
         for msg in bt2.TraceCollectionMessageIterator(path.as_posix()):
             if type(msg) is bt2._EventMessageConst:
                 self._handle_event(msg)
 
-        self.multiPETTree = MultiPETTimingNode()
-        for _, t in self._timing_trees.items():
-            self.multiPETTree.merge(t)
-
-    @property
-    def regions(self) -> list[str]:
-        """list[str]: Name of all the known regions."""
-        return list(self._regions)
-
     def _handle_event(self, msg: bt2._EventMessageConst):
         """Process a trace event message, extracting and storing any relevant information.
 
         Args:
             msg (bt2._EventMessageConst: Trace message describing the event to handle.
         """
-        if msg.event.name == "define_region":
-            pet = int(msg.event.packet.context_field["pet"])
-            regionid = int(msg.event.payload_field["id"])
-            name = str(msg.event.payload_field["name"])
-            self._region_id_to_name_map.setdefault(pet, {})[regionid] = name
-            self._regions.add(name)
-
-        elif msg.event.name == "region_profile":
-            pet = int(msg.event.packet.context_field["pet"])
-            region_id = int(msg.event.payload_field["id"])
-            parent_id = int(msg.event.payload_field["parentid"])
+        event = msg.event
+        if event.name == "define_region":
+            payload = event.payload_field
+            pet = int(event.packet.context_field["pet"])
+            regionid = int(payload["id"])
+            name = str(payload["name"])
+            self.region_id_to_name_map.setdefault(pet, {})[regionid] = name
+            self.regions.add(name)
+
+        elif event.name == "region_profile":
+            payload = event.payload_field
+            pet = int(event.packet.context_field["pet"])
+            region_id, parent_id, total, count, _min, _max = (
+                int(payload[field]) for field in ("id", "parentid", "total", "count", "min", "max")
+            )
 
             if region_id == 1:
                 # special case for outermost timed region
                 name = "TOP"
             else:
-                _map = self._region_id_to_name_map[pet]
+                _map = self.region_id_to_name_map[pet]
                 name = _map[region_id]  # should already be there
 
-            node = SinglePETTimingNode(region_id, pet, name)
-            node.total = int(msg.event.payload_field["total"])
-            node.count = int(msg.event.payload_field["count"])
-            node.min = int(msg.event.payload_field["min"])
-            node.max = int(msg.event.payload_field["max"])
-
-            # add child to the timing tree for the given pet
-            root = self._timing_trees.setdefault(pet, SinglePETTimingNode(0, pet, "TOP_LEVEL"))
-            if not root.add_child(parent_id, node):
-                raise RuntimeError(
-                    f"{self.__class__.__name__} child not added to tree pet = {pet}, regionid = {region_id}, parentid = {parent_id}, name = {name}"
-                )
+            timing = self.timings.get(pet)
+            if timing is None:
+                timing = self.timings[pet] = SinglePETTiming(pet)
+            timing.add_region(region_id, parent_id, name, total, count, _min, _max)
+
+
+def _read_trace(path: Path) -> _TraceReader:
+    """Read a single CTF trace. This is a module-level function so that it can be run by worker processes.
+
+    Args:
+        path (Path): Directory containing the trace to read.
+
+    Returns:
+        _TraceReader: Reader holding the timings found in the trace.
+    """
+    reader = _TraceReader()
+    reader.read(path)
+    return reader
+
+
+class ESMFTrace:
+    """Tree of MultiPetTimingNodes constructed by parsing the traces generated by ESMF.
+
+    Each CTF trace found in the given directory (that is, each directory containing a "metadata" file) is read
+    independently, possibly in parallel, and the timings of all the PETs are then merged into a single multi-PET tree.
+    Each PET must be found in only one of the traces, otherwise a ValueError is raised.
+
+    Args:
+        path (str): Directory containing the traces to parse.
+        use_cache (bool): Store the parsed traces in a cache file (under $XDG_CACHE_HOME/om3utils, or ~/.cache/om3utils)
+            and reuse it in subsequent reads, as long as none of the trace files was modified.
+        max_workers (int): Maximum number of processes used to read the traces in parallel when there is more than
+            one. If None, it defaults to the number of processors.
+    """
+
+    def __init__(self, path: Path, use_cache: bool = False, max_workers: int = 1):
+        if use_cache:
+            cache_file = _trace_cache_file(path)
+            signature = _trace_signature(path)
+            state = _load_trace_cache(cache_file, signature)
+            if state is not None:
+                self.__dict__.update(state)
+                return
+
+        timings = {}  # { pet -> SinglePETTiming }
+        self._regions = set()  # Set containing all known regions. Using a set ensures region's names are unique.
+
+        trace_dirs = sorted({metadata.parent for metadata in path.rglob("metadata")}) or [path]
+        if len(trace_dirs) > 1 and max_workers != 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                readers = list(executor.map(_read_trace, trace_dirs))
+        else:
+            readers = map(_read_trace, trace_dirs)
+        for reader in readers:
+            duplicated_pets = timings.keys() & reader.timings.keys()
+            if duplicated_pets:
+                raise ValueError(f"Timings of PETs {sorted(duplicated_pets)} found in more than one trace in {path}")
+            timings.update(reader.timings)
+            self._regions.update(reader.regions)
+
+        self.multiPETTree = MultiPETTimingNode()
+        for _, t in timings.items():
+            self.multiPETTree.merge_timing(t)
+
+        if use_cache:
+            _write_trace_cache(cache_file, signature, {"multiPETTree": self.multiPETTree, "_regions": self._regions})
+
+    @property
+    def regions(self) -> list[str]:
+        """list[str]: Name of all the known regions."""
+        return list(self._regions)
@@ -3,7 +3,8 @@
 from pathlib import Path
 import re
 
-from om3utils.utils import convert_from_string
+import numpy as np
+
 from om3utils.profiling import ProfilingParser
 
 
@@ -26,8 +27,23 @@ class FMSProfilingParser(ProfilingParser):
 
         # FMS provides the following metrics:
         self._metrics = ["hits", "tmin", "tmax", "tavg", "tstd", "tfrac", "grain", "pemin", "pemax"]
+        # Counts are integers, while timings are real numbers
+        self._dtypes = {metric: np.float64 for metric in self._metrics}
+        self._dtypes.update({metric: np.int64 for metric in ["hits", "grain", "pemin", "pemax"]})
         self._filename = filename
 
+        # Regular expression to extract the profiling section from the file
+        header = r"\s*hits\s*tmin\s*tmax\s*tavg\s*tstd\s*tfrac\s*grain\s*pemin\s*pemax\s*"
+        footer = r" MPP_STACK high water mark=\s*\d*"
+        self._section_re = re.compile(header + r"(.*)" + footer, re.DOTALL)
+
+        # Regular expression to parse the data for each region
+        profile_line = r"^\s*(?P<region>[a-zA-Z:()_/\-*&\s]+(?<!\s))"
+        for metric in self.metrics:
+            profile_line += r"\s+(?P<" + metric + r">[0-9.]+)"
+        profile_line += r"$"
+        self._region_re = re.compile(profile_line, re.MULTILINE)
+
     @property
     def metrics(self) -> list:
         return self._metrics
@@ -45,26 +61,17 @@ class FMSProfilingParser(ProfilingParser):
         if not profiling_file.is_file():
             raise FileNotFoundError(f"File not found: {profiling_file.as_posix()}")
 
-        # Regular expression to extract the profiling section from the file
-        header = r"\s*hits\s*tmin\s*tmax\s*tavg\s*tstd\s*tfrac\s*grain\s*pemin\s*pemax\s*"
-        footer = r" MPP_STACK high water mark=\s*\d*"
-        profiling_section_p = re.compile(header + r"(.*)" + footer, re.DOTALL)
+        with open(profiling_file, "r") as f:
+            profiling_section = self._section_re.search(f.read()).group(1)
 
-        # Regular expression to parse the data for each region
-        profile_line = r"^\s*(?P<region>[a-zA-Z:()_/\-*&\s]+(?<!\s))"
-        for metric in self.metrics:
-            profile_line += r"\s+(?P<" + metric + r">[0-9.]+)"
-        profile_line += r"$"
-        profiling_region_p = re.compile(profile_line, re.MULTILINE)
+        # Parse data. Each row is a tuple with the region name followed by the values of all the metrics, so that the
+        # values of each metric can be converted to numbers in a single call.
+        rows = self._region_re.findall(profiling_section)
+        columns = list(zip(*rows)) or [()] * (len(self.metrics) + 1)
 
-        # Parse data
-        stats = {"region": []}
-        stats.update(dict(zip(self.metrics, [[] for _ in self.metrics])))
-        with open(profiling_file, "r") as f:
-            profiling_section = profiling_section_p.search(f.read()).group(1)
-            for line in profiling_region_p.finditer(profiling_section):
-                stats["region"].append(line.group("region"))
-                for metric in self.metrics:
-                    stats[str(metric)].append(convert_from_string(line.group(metric)))
+        stats = {"region": list(columns[0])}
+        stats.update(
+            {metric: np.array(column, dtype=self._dtypes[metric]) for metric, column in zip(self.metrics, columns[1:])}
+        )
 
         return stats
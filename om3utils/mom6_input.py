@@ -48,6 +48,20 @@ from io import StringIO
 
 import f90nml
 
+# Patterns used to patch and unpatch MOM6 parameter files. These are compiled once, when the module is imported.
+_COMMENT_RE = re.compile(r"/\*.*?\*/", flags=re.DOTALL)
+_BLOCK_RE = re.compile(r"KPP%|%KPP|CVMix_CONVECTION%|%CVMix_CONVECTION|CVMIX_DDIFF%|%CVMIX_DDIFF")
+# Single pattern telling which change, if any, needs to be done to a line. All alternatives are anchored at the start of
+# the line and are tried in order, which sets their priority.
+_PATCH_RE = re.compile(
+    r"(?P<zstar>.*?Z\*)"
+    r"|(?P<block>.*?(?:" + _BLOCK_RE.pattern + r"))"
+    r"|(?P<override>#override\s*?)"
+    r"|(?P<incorrect_directive>#\s+)"
+    r"|(?P<comment_directive>#(?!override)\w+\b\s*=\s*\w+$)"
+)
+_ZSTAR_REV_RE = re.compile(r"ZSTAR")
+
 
 def _patch_mom6_input_str(mom6_input_str: str) -> tuple[str, dict]:
     """Modify the contents of a MOM6 file into a Fortran namelist format readable by f90nml.
@@ -73,53 +87,70 @@ def _patch_mom6_input_str(mom6_input_str: str) -> tuple[str, dict]:
     Returns:
         tuple: Contents of the patched MOM6 parameter file and the patch that was applied.
     """
-    # Define several patterns that need to be matched
-    comment_pattern = re.compile(r"/\*.*?\*/", flags=re.DOTALL)
-    zstar_pattern = re.compile(r"Z\*")
-    block_pattern = re.compile(r"KPP%|%KPP|CVMix_CONVECTION%|%CVMix_CONVECTION|CVMIX_DDIFF%|%CVMIX_DDIFF")
-    override_directive_pattern = re.compile(r"^(#override\s*?)")
-    incorrect_directive_pattern = re.compile(r"^(#\s+)")
-    comment_directive_pattern = re.compile(r"^#((?!override)\w+\b\s*=\s*\w+$)")
-
     # Modify the input while recording the changes
     patch = {}
-    output = ""
-    lines = mom6_input_str.split("\n")
-    for i in range(len(lines)):
-        line = lines[i] + "\n"
-        if zstar_pattern.search(line):
+    output = []
+    # Split the input into lines, each with its "\n" terminator. Unlike str.splitlines, StringIO only splits on "\n",
+    # which keeps the line numbering consistent with the output of f90nml.
+    lines = StringIO(mom6_input_str + "\n").readlines()
+    for i, line in enumerate(lines):
+        # Cheap check for the vast majority of lines, which need no changes: all directives start with "#", while all
+        # block delimiters contain a "%".
+        if line[0] != "#" and "%" not in line and "Z*" not in line:
+            output.append(line)
+            continue
+
+        match = _PATCH_RE.match(line)
+        if match is None:
+            output.append(line)
+        elif match.lastgroup == "zstar":
             patch[i] = ("zstar", line)
-            output += zstar_pattern.sub("ZSTAR", line)
-        elif block_pattern.search(line):
+            output.append(line.replace("Z*", "ZSTAR"))
+        elif match.lastgroup == "block":
             patch[i] = ("block", line)
-            output += block_pattern.sub("", line)
-        elif override_directive_pattern.search(line):
-            patch[i] = ("override", override_directive_pattern.match(line).group(0))
-            output += override_directive_pattern.sub("", line)
-        elif incorrect_directive_pattern.search(line):
-            patch[i] = (
-                "incorrect directive",
-                incorrect_directive_pattern.match(line).group(0),
-            )
-            output += incorrect_directive_pattern.sub("", line)
-        elif comment_directive_pattern.search(line):
+            output.append(_BLOCK_RE.sub("", line))
+        elif match.lastgroup == "override":
+            patch[i] = ("override", match.group())
+            output.append(line[match.end() :])
+        elif match.lastgroup == "incorrect_directive":
+            patch[i] = ("incorrect directive", match.group())
+            output.append(line[match.end() :])
+        else:  # comment_directive
             patch[i] = ("comment_directive", line)
-            output += "\n"
-        else:
-            output += line
+            output.append("\n")
 
     # Remove all C-style comments. These are not recorded and will not be undone.
     def replace_comment(match):
         return "\n" * match.group().count("\n")
 
-    output = comment_pattern.sub(replace_comment, output)
+    output = _COMMENT_RE.sub(replace_comment, "".join(output))
 
     return output, patch
 
 
+def _uppercase_variable_name(line: str) -> str:
+    """Change the name of the variable declared in a line of a MOM6 parameter file to uppercase.
+
+    Lines that are not variable declarations are returned unchanged.
+
+    Args:
+        line (str): Line of the MOM6 parameter file.
+
+    Returns:
+        str: Line with the variable name in uppercase.
+    """
+    name, sep, value = line.partition("=")
+    if sep and name.rstrip().isidentifier():
+        return name.upper() + sep + value
+    return line
+
+
 def _unpatch_mom6_input_str(mom6_input_str: str, patch: dict = None) -> str:
     """Undo the changes that were done to a MOM6 parameter file to make it into a conforming Fortran namelist.
 
+    Variable names are also changed to uppercase, as there seems to be no way of doing this with f90nml when applying
+    a namelist patch.
+
     Args:
         mom6_input_str (str): Contents of the MOM6 parameter file to unpatch.
         patch (dict):  A dict containing the patch to revert.
@@ -127,25 +158,24 @@ def _unpatch_mom6_input_str(mom6_input_str: str, patch: dict = None) -> str:
     Returns:
         str: Unpatched contents of the MOM6 parameter  file.
     """
-    output = ""
-    lines = mom6_input_str.split("\n")[1:-2]
-    for i in range(len(lines)):
-        line = lines[i] + "\n"
-        if i in patch:
-            if patch[i][0] == "block":
-                output += patch[i][1]
-            elif patch[i][0] == "zstar":
-                output += re.sub(r"ZSTAR", "Z*", line)
-            elif patch[i][0] == "override":
-                output += patch[i][1] + line
-            elif patch[i][0] == "incorrect directive":
-                output += patch[i][1] + line
-            elif patch[i][0] == "comment_directive":
-                output += patch[i][1]
-        else:
+    output = []
+    lines = StringIO(mom6_input_str + "\n").readlines()[1:-2]
+    for i, line in enumerate(lines):
+        entry = patch.get(i)
+        if entry is None:
             line = line.lstrip() if line != "\n" else line
-            output += line
-    return output
+            output.append(_uppercase_variable_name(line))
+            continue
+
+        kind, original = entry
+        if kind == "block" or kind == "comment_directive":
+            output.append(original)
+        elif kind == "zstar":
+            output.append(_uppercase_variable_name(_ZSTAR_REV_RE.sub("Z*", line)))
+        elif kind == "override" or kind == "incorrect directive":
+            # A directive alone in its line (e.g. "#\n") is followed by a variable declaration on the next line
+            output.append(original + (_uppercase_variable_name(line) if original.endswith("\n") else line))
+    return "".join(output)
 
 
 def _mom6_input_str_to_nml_str(mom6_input_str: str) -> str:
@@ -157,7 +187,7 @@ def _mom6_input_str_to_nml_str(mom6_input_str: str) -> str:
     Returns:
         str: Fortran namelist.
     """
-    return "&mom6\n" + mom6_input_str + "\n/"
+    return f"&mom6\n{mom6_input_str}\n/"
 
 
 def _nml_str_to_mom6_input_str(nml_str: str) -> str:
@@ -208,6 +238,19 @@ def _nml_str_to_mom6_input(nml_str: str) -> dict:
     return dict(nml.todict()["mom6"])
 
 
+def _write_mom6_input_str(mom6_input_str: str, file: Path):
+    """Write the contents of a MOM6 parameter file.
+
+    Args:
+        mom6_input_str (str): Contents of the MOM6 parameter file.
+        file (Path): File to write to. Can also be a file-like object opened in text mode.
+    """
+    if hasattr(file, "write"):
+        file.write(mom6_input_str)
+    else:
+        file.write_text(mom6_input_str)
+
+
 class Mom6Input(dict):
     """Class to read, store, modify and write a MOM6 parameter file.
 
@@ -220,36 +263,39 @@ class Mom6Input(dict):
     This is used to "undo" the changes when writing the file.
     """
 
-    # Patched contents of the file to make it look like proper f90 namelist
-    _mom6_input_str_patched = None
-
-    # Dictionary containing information that can be used to reconstruct the original file from the output of f90nml
-    _file_patch = {}
-
-    # A record of all the changes done to the dictionary that can be passed to f90nml to do round-trip parsing
-    _nml_patch = None
-
-    # A record of keys that have been deleted from the dictionary
-    _deleted_keys = []
-
     def __init__(self, file_name: str = None):
         """Read NOM6 parameters from file.
 
         Args:
-            file_name (str): Name of file to read.
+            file_name (str): Name of file to read. Can also be a file-like object opened in text mode.
         """
+        # Patched contents of the file to make it look like proper f90 namelist. This is kept as a namelist string, so
+        # that it does not need to be rebuilt every time the file is written.
+        self._nml_str_patched = None
+
+        # Dictionary containing information that can be used to reconstruct the original file from the output of f90nml
+        self._file_patch = {}
+
+        # A record of all the changes done to the dictionary that can be passed to f90nml to do round-trip parsing
+        self._nml_patch = None
+
+        # A record of keys that have been deleted from the dictionary
+        self._deleted_keys = []
+
         # Open file and read contents
-        file = Path(file_name)
-        if not file.is_file():
-            raise FileNotFoundError(f"File not found: {file.as_posix()}")
+        if hasattr(file_name, "read"):
+            mom6_input_str = file_name.read()
+        else:
+            file = Path(file_name)
+            if not file.is_file():
+                raise FileNotFoundError(f"File not found: {file.as_posix()}")
 
-        with open(file, "r") as f:
-            mom6_input_str = f.read()
+            mom6_input_str = file.read_text()
 
         # Convert file contents to dictionary
-        self._mom6_input_str_patched, self._file_patch = _patch_mom6_input_str(mom6_input_str)
-        nml_str = _mom6_input_str_to_nml_str(self._mom6_input_str_patched)
-        mom6_input = _nml_str_to_mom6_input(nml_str)
+        mom6_input_str_patched, self._file_patch = _patch_mom6_input_str(mom6_input_str)
+        self._nml_str_patched = _mom6_input_str_to_nml_str(mom6_input_str_patched)
+        mom6_input = _nml_str_to_mom6_input(self._nml_str_patched)
 
         # Initialize class dictionary
         super().__init__(mom6_input)
@@ -264,13 +310,14 @@ class Mom6Input(dict):
         This method takes into account that all keys should be stored in uppercase. It also adds the new item to the
         namelist patch used for round-trip parsing.
         """
-        super().__setitem__(key.upper(), value)
+        key = key.upper()
+        super().__setitem__(key, value)
 
-        if key.upper() in self._deleted_keys:
-            self._deleted_keys.remove(key.upper())
+        if key in self._deleted_keys:
+            self._deleted_keys.remove(key)
 
         if self._nml_patch:
-            self._nml_patch["mom6"][key.upper()] = value
+            self._nml_patch["mom6"][key] = value
 
     def __getitem__(self, key):
         """Override method to get item from dict, taking into account all keys are stored in uppercase."""
@@ -278,45 +325,47 @@ class Mom6Input(dict):
 
     def __delitem__(self, key):
         """Override method to delete item from dict, so that all keys are stored in uppercase."""
-        self._deleted_keys.append(key.upper())
-        super().__delitem__(key.upper())
+        key = key.upper()
+        self._deleted_keys.append(key)
+        super().__delitem__(key)
 
     def write(self, file: Path):
         """Write contents of MOM6Input to a file.
 
         Args:
-            file (Path): File to write to.
+            file (Path): File to write to. Can also be a file-like object opened in text mode.
         """
         # Streams to pass to f90nml
-        nml_file = StringIO(_mom6_input_str_to_nml_str(self._mom6_input_str_patched))
+        nml_file = StringIO(self._nml_str_patched)
         tmp_file = StringIO("")
 
         parser = f90nml.Parser()
         parser.read(nml_file, self._nml_patch, tmp_file)
         mom6_input_str = _unpatch_mom6_input_str(tmp_file.getvalue(), self._file_patch)
 
-        # Change keys to uppercase using a regex substitution, as there seems to be no way of doing this with f90nml
-        # when applying a nml patch.
-        mom6_input_str = re.sub(r"((?<=^)|(?<=\n))(\w+)", lambda pat: pat.group(2).upper(), mom6_input_str)
-
-        # Explicitly removed keys from string
-        for key in self._deleted_keys:
-            mom6_input_str = re.sub(r"\s*" + f"{key}" + r"\s*=\s*\S*\s*\n", r"\n", mom6_input_str)
+        # Explicitly removed keys from string. All keys are removed in a single pass, with consecutive deleted lines
+        # collapsed together, as if each key had been removed in turn.
+        if self._deleted_keys:
+            keys = "|".join(map(re.escape, self._deleted_keys))
+            deleted_pattern = re.compile(r"(?:\s*(?:" + keys + r")\s*=\s*\S*\s*\n)+")
+            mom6_input_str = deleted_pattern.sub("\n", mom6_input_str)
 
-        file.write_text(mom6_input_str)
+        _write_mom6_input_str(mom6_input_str, file)
 
     def _keys_to_upper(self):
         """Change all keys in dictionary to uppercase."""
-        for key in list(self.keys()):
-            if not key.isupper():
-                self[key.upper()] = self.pop(key)
+        if not all(key.isupper() for key in self):
+            # Rebuild the dictionary in one go, bypassing the overridden __setitem__
+            items = {key.upper(): value for key, value in self.items()}
+            self.clear()
+            super().update(items)
 
 
 def read_mom6_input(file_name: str) -> Mom6Input:
     """Read the contents of a MOM6 parameter file and return its contents as an instance of the MOM6Input class.
 
     Args:
-        file_name: Name of MOM6 parameter file to read.
+        file_name: Name of MOM6 parameter file to read. Can also be a file-like object opened in text mode.
 
     Returns:
         MOM6Input: Contents of parameter file.
@@ -329,11 +378,11 @@ def write_mom6_input(mom_input: [dict | Mom6Input], file: Path):
 
     Args:
         mom_input (dict|MOM6Input): MOM6 parameters.
-        file (Path): File to write to.
+        file (Path): File to write to. Can also be a file-like object opened in text mode.
     """
     if isinstance(mom_input, Mom6Input):
         mom_input.write(file)
     else:
         nml_str = _mom6_input_to_nml_str(mom_input)
         mom6_input_str = _nml_str_to_mom6_input_str(nml_str) + "\n"
-        file.write_text(mom6_input_str)
+        _write_mom6_input_str(mom6_input_str, file)
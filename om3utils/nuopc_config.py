@@ -68,59 +68,71 @@ The CESM driver then uses tables as defined in Resource Files to store Fortran N
 
 """
 
+from contextlib import nullcontext
 from pathlib import Path
 import re
 
 from om3utils.utils import convert_from_string, convert_to_string
 
+# Patterns used to parse NUOPC configuration files. These are compiled once, when the module is imported.
+_LABEL_VALUE_RE = re.compile(r"\s*(\w+)\s*:\s*(.+)\s*")
+_TABLE_START_RE = re.compile(r"\s*(\w+)\s*::\s*")
+_TABLE_END_RE = re.compile(r"\s*::\s*")
+_ASSIGNMENT_RE = re.compile(r"\s*(\w+)\s*=\s*(\S+)\s*")
+
 
 def read_nuopc_config(file_name: str) -> dict:
     """Read a NUOPC config file and return its contents as a dictionary.
 
     Args:
-        file_name (str): File to read.
+        file_name (str): File to read. Can also be a file-like object opened in text mode.
 
     Returns:
         dict: Contents of file.
     """
-    fname = Path(file_name)
-    if not fname.is_file():
-        raise FileNotFoundError(f"File not found: {fname.as_posix()}")
-
-    label_value_pattern = re.compile(r"\s*(\w+)\s*:\s*(.+)\s*")
-    table_start_pattern = re.compile(r"\s*(\w+)\s*::\s*")
-    table_end_pattern = re.compile(r"\s*::\s*")
-    assignment_pattern = re.compile(r"\s*(\w+)\s*=\s*(\S+)\s*")
+    if hasattr(file_name, "read"):
+        file_context = nullcontext(file_name)
+        # Name used in error messages. In-memory streams have no name.
+        source = getattr(file_name, "name", "<stream>")
+    else:
+        source = file_name
+        fname = Path(file_name)
+        if not fname.is_file():
+            raise FileNotFoundError(f"File not found: {fname.as_posix()}")
+        file_context = open(fname, "r")
 
     config = {}
-    with open(fname, "r") as stream:
+    with file_context as stream:
         reading_table = False
         label = None
         table = None
         for line in stream:
-            line = re.sub(r"(#).*", "", line)
+            line = line.partition("#")[0]
             if line.strip():
                 if reading_table:
-                    if re.match(table_end_pattern, line):
+                    # Only the table delimiters contain a double colon
+                    if "::" in line and _TABLE_END_RE.match(line):
                         config[label] = table
                         reading_table = False
                     else:
-                        match = re.match(assignment_pattern, line)
-                        if match:
+                        # Most table entries are simple assignments that can be split without a regex
+                        name, sep, value = line.partition("=")
+                        name, value = name.strip(), value.split()
+                        if sep and value and name.isidentifier():
+                            table[name] = convert_from_string(value[0])
+                        elif match := _ASSIGNMENT_RE.match(line):
                             table[match.group(1)] = convert_from_string(match.group(2))
                         else:
                             raise ValueError(
-                                f"Line: {line} in file {file_name} is not a valid NUOPC configuration specification"
+                                f"Line: {line} in file {source} is not a valid NUOPC configuration specification"
                             )
 
-                elif re.match(table_start_pattern, line):
+                elif "::" in line and (match := _TABLE_START_RE.match(line)):
                     reading_table = True
-                    match = re.match(label_value_pattern, line)
                     label = match.group(1)
                     table = {}
 
-                elif re.match(label_value_pattern, line):
-                    match = re.match(label_value_pattern, line)
+                elif match := _LABEL_VALUE_RE.match(line):
                     config[match.group(1)] = [convert_from_string(string) for string in match.group(2).split()]
 
     return config
@@ -131,14 +143,19 @@ def write_nuopc_config(config: dict, file: Path):
 
     Args:
         config (dict): NUOPC configuration to write.
-        file (Path): File to write to.
+        file (Path): File to write to. Can also be a file-like object opened in text mode.
     """
-    with open(file, "w") as stream:
-        for key, item in config.items():
-            if isinstance(item, dict):
-                stream.write(key + "::\n")
-                for label, value in item.items():
-                    stream.write("  " + label + " = " + convert_to_string(value) + "\n")
-                stream.write("::\n\n")
-            else:
-                stream.write(key + ": " + " ".join(map(convert_to_string, item)) + "\n")
+    parts = []
+    for key, item in config.items():
+        if isinstance(item, dict):
+            parts.append(key + "::\n")
+            for label, value in item.items():
+                parts.append("  " + label + " = " + convert_to_string(value) + "\n")
+            parts.append("::\n\n")
+        else:
+            parts.append(key + ": " + " ".join(map(convert_to_string, item)) + "\n")
+
+    if hasattr(file, "write"):
+        file.write("".join(parts))
+    else:
+        Path(file).write_text("".join(parts))
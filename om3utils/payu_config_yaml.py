@@ -17,16 +17,19 @@ def read_payu_config_yaml(file_name: str) -> CommentedMap:
     This function uses ruamel to parse the YAML file, so that we can do round-trip parsing.
 
     Args:
-        file_name: Name of file to read.
+        file_name: Name of file to read. Can also be a file-like object opened in text mode.
 
     Returns:
         dict: Payu configuration.
     """
-    fname = Path(file_name)
-    if not fname.is_file():
-        raise FileNotFoundError(f"File not found: {fname.as_posix()}")
+    if hasattr(file_name, "read"):
+        config = YAML().load(file_name)
+    else:
+        fname = Path(file_name)
+        if not fname.is_file():
+            raise FileNotFoundError(f"File not found: {fname.as_posix()}")
 
-    config = YAML().load(fname)
+        config = YAML().load(fname)
 
     return config
 
@@ -36,6 +39,6 @@ def write_payu_config_yaml(config: [dict | CommentedMap], file: Path):
 
     Args:
         config (dict| CommentedMap): Payu configuration.
-        file(Path): File to write to.
+        file(Path): File to write to. Can also be a file-like object opened in text mode.
     """
     YAML().dump(config, file)
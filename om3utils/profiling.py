@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Callable
 
+import numpy as np
 import xarray as xr
 
 from om3utils.payu_config_yaml import read_payu_config_yaml
@@ -24,8 +25,8 @@ class ProfilingParser(ABC):
         ...
     }
 
-    The 'region' values correspond to the labels of the profile regions. Then, for each metric, there is a list of
-    values, one for each profiling region. Therefore, 'val1a', is the value for metric a of region 1.
+    The 'region' values correspond to the labels of the profile regions. Then, for each metric, there is a list (or a
+    NumPy array) of values, one for each profiling region. Therefore, 'val1a', is the value for metric a of region 1.
     """
 
     def __init__(self):
@@ -63,20 +64,32 @@ def parse_profiling_data(
     Returns:
         Dataset: Profiling data.
     """
-    datasets = []
-    for run_dir in [Path(path) for path in run_dirs]:
+    metrics = parser.metrics
+    var = []
+    regions = []
+    values = {metric: [] for metric in metrics}
+    for run_dir in map(Path, run_dirs):
         data = parser.read(run_dir)
-        datasets.append(
-            xr.Dataset(
-                data_vars=dict(
-                    zip(
-                        parser.metrics,
-                        [xr.DataArray([data[metric]], dims=[varname, "region"]) for metric in parser.metrics],
-                    )
-                ),
-                coords={"region": data["region"], varname: [getvar(run_dir)]},
-            )
+        var.append(getvar(run_dir))
+        regions.append(list(data["region"]))
+        for metric in metrics:
+            values[metric].append(data[metric])
+
+    # Usually all runs have the same profiling regions, so the data can be stored directly in a single dataset
+    if regions and all(run_regions == regions[0] for run_regions in regions):
+        return xr.Dataset(
+            data_vars={metric: ([varname, "region"], np.asarray(values[metric])) for metric in metrics},
+            coords={"region": regions[0], varname: var},
         )
 
-    # Create dataset with all the data
-    return xr.concat(datasets, dim=varname)
+    # Otherwise, create one dataset per run and let xarray align the regions when concatenating them
+    datasets = [
+        xr.Dataset(
+            data_vars={metric: xr.DataArray([values[metric][i]], dims=[varname, "region"]) for metric in metrics},
+            coords={"region": regions[i], varname: [var[i]]},
+        )
+        for i in range(len(var))
+    ]
+
+    # Create dataset with all the data. Regions missing from a run are filled with NaN.
+    return xr.concat(datasets, dim=varname, join="outer")
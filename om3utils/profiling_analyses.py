@@ -19,20 +19,33 @@ def scaling_ncpus(run_dir):
     return config["ncpus"]
 
 
-def scaling_speedup(stats: xr.Dataset) -> xr.Dataset:
-    """Calculates the parallel speedup from scaling data.
+def _scaling_speedup(stats: xr.Dataset, ncpus_min: int) -> xr.Dataset:
+    """Calculates the parallel speedup from scaling data, relative to the run with the given number of CPUs.
 
     Args:
         stats (Dataset): Scaling data, stored as a xarray dataset.
+        ncpus_min (int): Smallest number of CPUs in the scaling data.
 
     Returns:
         Dataset: Parallel speedup.
     """
-    speedup = stats.tavg.sel(ncpus=stats["ncpus"].min()) / stats.tavg
+    speedup = stats.tavg.sel(ncpus=ncpus_min) / stats.tavg
     speedup.name = "speedup"
     return speedup
 
 
+def scaling_speedup(stats: xr.Dataset) -> xr.Dataset:
+    """Calculates the parallel speedup from scaling data.
+
+    Args:
+        stats (Dataset): Scaling data, stored as a xarray dataset.
+
+    Returns:
+        Dataset: Parallel speedup.
+    """
+    return _scaling_speedup(stats, stats["ncpus"].min().item())
+
+
 def scaling_efficiency(stats: xr.Dataset) -> xr.Dataset:
     """Calculates the parallel efficiency from scaling data.
 
@@ -42,7 +55,8 @@ def scaling_efficiency(stats: xr.Dataset) -> xr.Dataset:
     Returns:
         Dataset: Parallel efficiency.
     """
-    speedup = scaling_speedup(stats)
-    eff = speedup / speedup.ncpus * 100 * stats["ncpus"].min()
+    ncpus_min = stats["ncpus"].min().item()
+    speedup = _scaling_speedup(stats, ncpus_min)
+    eff = speedup / speedup.ncpus * 100 * ncpus_min
     eff.name = "parallel efficiency [%]"
     return eff
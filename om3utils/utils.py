@@ -1,3 +1,20 @@
+import re
+
+# Fortran logicals, in lowercase, and the corresponding Python bools
+_FORTRAN_LOGICALS = {".true.": True, ".false.": False}
+
+# Numbers that can be read from a string, following the syntax accepted by int() and float(). Integers are tried first,
+# so that they are not converted to floats. Real numbers in double precision can use the "old" Fortran `D` delimiter for
+# the exponent.
+_DIGITS = r"\d(?:_?\d)*"
+_MANTISSA = rf"[+-]?(?:{_DIGITS}\.?(?:{_DIGITS})?|\.{_DIGITS})"
+_NUMBER_RE = re.compile(
+    rf"(?P<int>[+-]?{_DIGITS})"
+    rf"|(?P<float>{_MANTISSA}(?:[eE][+-]?{_DIGITS})?|[+-]?(?i:inf|infinity|nan))"
+    rf"|(?P<double>{_MANTISSA}D[+-]?{_DIGITS})"
+)
+
+
 def convert_from_string(value: str):
     """Tries to convert a string to the most appropriate type. Leaves it unchanged if conversion does not succeed.
 
@@ -5,23 +22,21 @@ def convert_from_string(value: str):
     delimiter.
     """
     # Start by trying to convert from a Fortran logical to a Python bool
-    if value.lower() == ".true.":
-        return True
-    elif value.lower() == ".false.":
-        return False
-    # Next try to convert to integer or float
-    for conversion in [
-        lambda: int(value),
-        lambda: float(value),
-        lambda: float(value.replace("D", "e")),
-    ]:
-        try:
-            out = conversion()
-        except ValueError:
-            continue
-        return out
-    # None of the above succeeded, so just return the string
-    return value
+    logical = _FORTRAN_LOGICALS.get(value.lower())
+    if logical is not None:
+        return logical
+    # Next try to convert to integer or float. Like int() and float(), surrounding whitespace is ignored.
+    number = value.strip()
+    match = _NUMBER_RE.fullmatch(number)
+    if match is None:
+        # None of the above succeeded, so just return the string
+        return value
+    elif match.lastgroup == "int":
+        return int(number)
+    elif match.lastgroup == "float":
+        return float(number)
+    else:
+        return float(number.replace("D", "e"))
 
 
 def convert_to_string(value) -> str:
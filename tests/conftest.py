@@ -2,7 +2,7 @@ import pytest
 import xarray as xr
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def profiling_data():
     regions = ["Total runtime", "Ocean Initialization"]
     ncpus = [1, 2, 4]
@@ -19,7 +19,7 @@ def profiling_data():
     return regions, ncpus, hits, tmin, tmax, tavg
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def simple_scaling_data(profiling_data):
     regions, ncpus, hits, tmin, tmax, tavg = profiling_data
 
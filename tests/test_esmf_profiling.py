@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from pathlib import Path
 
@@ -10,3 +11,16 @@ def test_read_missing_esmf_profiling_dir():
     with pytest.raises(FileNotFoundError):
         parser = ESMFProfilingParser("benchmark")
         parser.read(Path("garbage"))
+
+
+def test_esmf_profiling_read_dtypes(tmp_path, mocker):
+    (tmp_path / "prof").mkdir()
+    mocker.patch("om3utils.esmf_trace.bt2.TraceCollectionMessageIterator", return_value=[])
+
+    parser = ESMFProfilingParser("prof")
+    stats = parser.read(tmp_path)
+
+    assert stats["region"] == ["TOP"]
+    assert stats["hits"].dtype == np.int64
+    for metric in ["tmin", "tmax", "tavg", "ttot"]:
+        assert stats[metric].dtype == np.float64
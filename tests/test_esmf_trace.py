@@ -1,8 +1,12 @@
+import copyreg
+import pickle
+
 import pytest
 
 bt2 = pytest.importorskip("bt2", reason="Requires babeltrace2 python bindings")
 
-from om3utils.esmf_trace import SinglePETTimingNode, MultiPETTimingNode
+from om3utils.esmf_trace import SinglePETTimingNode, SinglePETTiming, MultiPETTimingNode, ESMFTrace
+from om3utils.esmf_trace import _trace_cache_file, _trace_signature, _TraceReader
 
 
 @pytest.fixture()
@@ -72,6 +76,32 @@ def test_single_timing_node_incorrect_tree(single_pet_tree_nodes):
         root.add_child(2, child2)
 
 
+def test_single_pet_timing():
+    timing = SinglePETTiming(10)
+    timing.add_region(1, 0, "region_a", 100, 2, 40, 60)
+    timing.add_region(5, 1, "region_b", 30, 1, 30, 30)
+    timing.add_region(3, 0, "region_c", 10, 1, 10, 10)
+
+    assert len(timing) == 4
+    assert timing.pet == 10
+    assert timing.names == ["TOP_LEVEL", "region_a", "region_b", "region_c"]
+    assert list(timing.parents) == [-1, 0, 1, 0]
+    assert list(timing.totals) == [0, 100, 30, 10]
+    assert list(timing.counts) == [0, 2, 1, 1]
+    assert list(timing.mins[1:]) == [40, 30, 10]
+    assert list(timing.maxs[1:]) == [60, 30, 10]
+    assert timing.children(0) == [1, 3]
+    assert timing.children(1) == [2]
+    assert timing.children(2) == []
+
+
+def test_single_pet_timing_unknown_parent():
+    timing = SinglePETTiming(10)
+
+    with pytest.raises(KeyError):
+        timing.add_region(2, 1, "region_b", 30, 1, 30, 30)
+
+
 @pytest.fixture()
 def multi_pet_nodes(tree_nodes):
     node1, node2, node3 = tree_nodes([0, 0, 0], [1, 2, 3], ["region", "region", "region"])
@@ -151,3 +181,202 @@ def test_multi_timing_tree(multi_timing_tree):
     assert multi.pet_count == 3
     assert multi.children["region_b"].pet_count == 3
     assert multi.children["region_b"].children["region_c"].pet_count == 3
+
+
+def test_multi_timing_tree_from_single_pet_timings(multi_timing_tree):
+    multi_from_nodes = MultiPETTimingNode()
+    multi_from_timings = MultiPETTimingNode()
+    for pet, tree in enumerate(multi_timing_tree):
+        tree.children[0].total = 10 * (pet + 1)
+        tree.children[0].count = 2
+        tree.children[0].min = 4 + pet
+        tree.children[0].max = 6 + pet
+        multi_from_nodes.merge(tree)
+
+        timing = SinglePETTiming(pet)
+        timing.add_region(1, 0, "region_b", 10 * (pet + 1), 2, 4 + pet, 6 + pet)
+        timing.add_region(2, 1, "region_c", 0, 0, 0, 0)
+        multi_from_timings.merge_timing(timing)
+
+    for multi in [multi_from_nodes, multi_from_timings]:
+        assert multi.pet_count == 3
+        assert multi.children["region_b"].total_sum == 60
+        assert multi.children["region_b"].total_min == 4
+        assert multi.children["region_b"].total_min_pet == 0
+        assert multi.children["region_b"].total_max == 8
+        assert multi.children["region_b"].total_max_pet == 2
+        assert multi.children["region_b"].counts_match and multi.children["region_b"].count_each == 2
+        assert multi.children["region_b"].children["region_c"].pet_count == 3
+
+
+@pytest.fixture()
+def cached_trace(tmp_path, mocker, monkeypatch):
+    """Directory with an empty trace, a cache directory inside tmp_path and a mocked trace iterator.
+
+    Returns:
+        tuple: Trace directory and mocked trace iterator.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", (tmp_path / "cache").as_posix())
+    trace_dir = tmp_path / "traces"
+    trace_dir.mkdir()
+    (trace_dir / "metadata").write_text("")
+    iterator = mocker.patch("om3utils.esmf_trace.bt2.TraceCollectionMessageIterator", return_value=[])
+    return trace_dir, iterator
+
+
+def test_esmf_trace_cache(cached_trace):
+    trace_dir, iterator = cached_trace
+
+    trace = ESMFTrace(trace_dir, use_cache=True)
+    assert iterator.call_count == 1
+    assert trace.regions == ["TOP"]
+
+    trace = ESMFTrace(trace_dir, use_cache=True)
+    assert iterator.call_count == 1
+    assert trace.regions == ["TOP"]
+    assert trace.multiPETTree.pet_count == 0
+
+    # Modifying the traces invalidates the cache
+    (trace_dir / "metadata").write_text("modified")
+    ESMFTrace(trace_dir, use_cache=True)
+    assert iterator.call_count == 2
+
+    ESMFTrace(trace_dir)
+    assert iterator.call_count == 3
+
+    # Only the merged tree and the regions are cached
+    with open(_trace_cache_file(trace_dir), "rb") as f:
+        _, state = pickle.load(f)
+    assert state.keys() == {"multiPETTree", "_regions"}
+
+
+class _OldLayoutNode:
+    """Pickles as a MultiPETTimingNode with a slot that no longer exists."""
+
+    def __reduce__(self):
+        return copyreg._reconstructor, (MultiPETTimingNode, object, None), (None, {"_stats": None})
+
+
+@pytest.mark.parametrize(
+    "cache_content",
+    [
+        b"garbage",
+        b"",
+        pickle.dumps(None),
+        pickle.dumps(((0, "unknown"), {})),
+    ],
+    ids=["corrupt", "empty", "wrong_type", "old_version"],
+)
+def test_esmf_trace_invalid_cache(cached_trace, cache_content):
+    trace_dir, iterator = cached_trace
+    cache_file = _trace_cache_file(trace_dir)
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_bytes(cache_content)
+
+    trace = ESMFTrace(trace_dir, use_cache=True)
+    assert iterator.call_count == 1
+    assert trace.regions == ["TOP"]
+
+    # The invalid cache is replaced by a valid one
+    ESMFTrace(trace_dir, use_cache=True)
+    assert iterator.call_count == 1
+    assert [p.name for p in cache_file.parent.iterdir()] == [cache_file.name]
+
+
+def test_esmf_trace_stale_cache(cached_trace, monkeypatch):
+    trace_dir, iterator = cached_trace
+    cache_file = _trace_cache_file(trace_dir)
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_bytes(pickle.dumps((_trace_signature(trace_dir), {"multiPETTree": _OldLayoutNode()})))
+
+    trace = ESMFTrace(trace_dir, use_cache=True)
+    assert iterator.call_count == 1
+    assert trace.multiPETTree.pet_count == 0
+
+    # Caches written with a different layout version are ignored
+    monkeypatch.setattr("om3utils.esmf_trace._TRACE_CACHE_VERSION", -1)
+    ESMFTrace(trace_dir, use_cache=True)
+    assert iterator.call_count == 2
+
+
+def test_esmf_trace_unreadable_cache(cached_trace, mocker):
+    trace_dir, iterator = cached_trace
+    ESMFTrace(trace_dir, use_cache=True)
+    mocker.patch("om3utils.esmf_trace.open", side_effect=PermissionError, create=True)
+
+    trace = ESMFTrace(trace_dir, use_cache=True)
+    assert iterator.call_count == 2
+    assert trace.regions == ["TOP"]
+
+
+def test_esmf_trace_unwritable_cache(cached_trace, monkeypatch, tmp_path):
+    trace_dir, iterator = cached_trace
+    # The cache directory cannot be created, as its parent is a file
+    (tmp_path / "read_only").write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", (tmp_path / "read_only").as_posix())
+
+    with pytest.warns(UserWarning, match="Unable to write trace cache file"):
+        trace = ESMFTrace(trace_dir, use_cache=True)
+    assert iterator.call_count == 1
+    assert trace.regions == ["TOP"]
+
+
+def test_esmf_trace_multiple_traces(tmp_path, mocker):
+    for trace in ["trace_1", "trace_0"]:
+        (tmp_path / trace).mkdir()
+        (tmp_path / trace / "metadata").write_text("")
+    iterator = mocker.patch("om3utils.esmf_trace.bt2.TraceCollectionMessageIterator", return_value=[])
+
+    trace = ESMFTrace(tmp_path)
+
+    assert iterator.call_args_list == [
+        mocker.call((tmp_path / "trace_0").as_posix()),
+        mocker.call((tmp_path / "trace_1").as_posix()),
+    ]
+    assert trace.regions == ["TOP"]
+
+
+def _fake_read_trace(path):
+    """Replacement of _read_trace that can be used by worker processes. Each "trace_<n>" directory contains PETs 2n and
+    2n+1, while any "duplicate" directory contains PET 0."""
+    reader = _TraceReader()
+    first_pet = 0 if path.name == "duplicate" else 2 * int(path.name.split("_")[1])
+    for pet in [first_pet, first_pet + 1]:
+        timing = SinglePETTiming(pet)
+        timing.add_region(1, 0, "TOP", 100 * (pet + 1), 1, 100 * (pet + 1), 100 * (pet + 1))
+        timing.add_region(2, 1, "region_a", 10 * (pet + 1), 2, 4 + pet, 6 + pet)
+        reader.timings[pet] = timing
+    reader.regions.add("region_a")
+    return reader
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_esmf_trace_parallel_read(tmp_path, monkeypatch, max_workers):
+    for trace in ["trace_1", "trace_0"]:
+        (tmp_path / trace).mkdir()
+        (tmp_path / trace / "metadata").write_text("")
+    monkeypatch.setattr("om3utils.esmf_trace._read_trace", _fake_read_trace)
+
+    trace = ESMFTrace(tmp_path, max_workers=max_workers)
+
+    assert sorted(trace.regions) == ["TOP", "region_a"]
+    assert trace.multiPETTree.pet_count == 4
+    top = trace.multiPETTree.children["TOP"]
+    assert top.pet_count == 4
+    assert top.total_sum == 1000
+    assert top.total_min_pet == 0
+    assert top.total_max_pet == 3
+    region_a = top.children["region_a"]
+    assert region_a.total_sum == 100
+    assert region_a.counts_match and region_a.count_each == 2
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_esmf_trace_duplicate_pets(tmp_path, monkeypatch, max_workers):
+    for trace in ["trace_0", "duplicate"]:
+        (tmp_path / trace).mkdir()
+        (tmp_path / trace / "metadata").write_text("")
+    monkeypatch.setattr("om3utils.esmf_trace._read_trace", _fake_read_trace)
+
+    with pytest.raises(ValueError, match=r"PETs \[0, 1\]"):
+        ESMFTrace(tmp_path, max_workers=max_workers)
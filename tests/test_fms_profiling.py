@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from pathlib import Path
 
@@ -5,7 +6,7 @@ from test_utils import MockFile
 from om3utils.fms_profiling import FMSProfilingParser
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def simple_fms_stats():
     return {
         "region": [
@@ -15,15 +16,15 @@ def simple_fms_stats():
             "Ocean dynamics",
             "Ocean thermodynamics and tracers",
         ],
-        "hits": [1.0, 2.0, 23.0, 96.0, 72.0],
+        "hits": [1, 2, 23, 96, 72],
         "tmin": [138.600364, 2.344926, 86.869466, 43.721019, 27.377185],
         "tmax": [138.600366, 2.345701, 86.871652, 44.391032, 33.281659],
         "tavg": [138.600365, 2.345388, 86.87045, 43.957944, 29.950144],
         "tstd": [1e-06, 0.000198, 0.000744, 0.244785, 1.792324],
         "tfrac": [1.0, 0.017, 0.627, 0.317, 0.216],
-        "grain": [0.0, 11.0, 1.0, 11.0, 11.0],
-        "pemin": [0.0, 0.0, 0.0, 0.0, 0.0],
-        "pemax": [11.0, 11.0, 11.0, 11.0, 11.0],
+        "grain": [0, 11, 1, 11, 11],
+        "pemin": [0, 0, 0, 0, 0],
+        "pemax": [11, 11, 11, 11, 11],
     }
 
 
@@ -43,14 +44,18 @@ Ocean dynamics                       96     43.721019     44.391032     43.95794
 Ocean thermodynamics and tracers     72     27.377185     33.281659     29.950144      1.792324  0.216    11     0    11
  MPP_STACK high water mark=           0
 """
-    return MockFile(file, output_str)
+    return MockFile(output_str, file)
 
 
 def test_fms_profiling_read(tmp_path, simple_fms_output_file, simple_fms_stats):
     parser = FMSProfilingParser(simple_fms_output_file.file.name)
     stats = parser.read(tmp_path)
 
-    assert stats == simple_fms_stats
+    assert stats.keys() == simple_fms_stats.keys()
+    assert stats["region"] == simple_fms_stats["region"]
+    for metric in parser.metrics:
+        np.testing.assert_array_equal(stats[metric], simple_fms_stats[metric])
+        assert stats[metric].dtype == np.asarray(simple_fms_stats[metric]).dtype
 
 
 def test_read_missing_fms_profiling_file():
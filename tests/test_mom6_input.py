@@ -1,9 +1,17 @@
 import pytest
-import filecmp
+from io import StringIO
 
 from test_utils import MockFile
 from om3utils.mom6_input import Mom6Input, write_mom6_input, read_mom6_input
 
+SIMPLE_MOM6_INPUT_STR = """BOOL = True
+DT = 1800.0
+IGNORED_DIRECTIVE = 3
+INCORRECT_DIRECTIVE = 2
+N_SMOOTH = 4
+REGRIDDING_COORDINATE_MODE = 'ZSTAR'
+"""
+
 
 @pytest.fixture()
 def simple_mom6_input():
@@ -20,19 +28,16 @@ def simple_mom6_input():
 @pytest.fixture()
 def simple_mom6_input_file(tmp_path):
     file = tmp_path / "simple_mom6_input_file"
-    mom6_input_str = """BOOL = True
-DT = 1800.0
-IGNORED_DIRECTIVE = 3
-INCORRECT_DIRECTIVE = 2
-N_SMOOTH = 4
-REGRIDDING_COORDINATE_MODE = 'ZSTAR'
-"""
-    return MockFile(file, mom6_input_str)
+    return MockFile(SIMPLE_MOM6_INPUT_STR, file)
 
 
 @pytest.fixture()
-def complex_mom6_input_file(tmp_path):
-    file = tmp_path / "complex_mom6_input_file"
+def simple_mom6_input_stream():
+    return MockFile(SIMPLE_MOM6_INPUT_STR)
+
+
+@pytest.fixture()
+def complex_mom6_input_file():
     mom6_input_str = """
 /* This is a comment
    spanning two lines */
@@ -50,12 +55,11 @@ DT = 1800.0  ! This is a comment
 TO_BE_REMOVED = 10.0 
 BOOL = True
 """
-    return MockFile(file, mom6_input_str)
+    return MockFile(mom6_input_str)
 
 
 @pytest.fixture()
-def modified_mom6_input_file(tmp_path):
-    file = tmp_path / "modified_mom6_input_file"
+def modified_mom6_input_file():
     mom6_input_str = """
 
 
@@ -75,10 +79,16 @@ BOOL = True
 
 ADDED_VAR = 32
 """
-    return MockFile(file, mom6_input_str)
+    return MockFile(mom6_input_str)
 
 
-def test_read_mom6_input(tmp_path, simple_mom6_input, simple_mom6_input_file):
+def test_read_mom6_input(simple_mom6_input, simple_mom6_input_stream):
+    mom6_input_from_file = read_mom6_input(file_name=simple_mom6_input_stream.file)
+
+    assert mom6_input_from_file == simple_mom6_input
+
+
+def test_read_mom6_input_from_disk(simple_mom6_input, simple_mom6_input_file):
     mom6_input_from_file = read_mom6_input(file_name=simple_mom6_input_file.file)
 
     assert mom6_input_from_file == simple_mom6_input
@@ -88,10 +98,10 @@ def test_write_mom6_input(tmp_path, simple_mom6_input, simple_mom6_input_file):
     file = tmp_path / "MOM_input"
     write_mom6_input(simple_mom6_input, file)
 
-    assert filecmp.cmp(file, simple_mom6_input_file.file)
+    assert file.read_text() == simple_mom6_input_file.string
 
 
-def test_round_trip_mom6_input(tmp_path, complex_mom6_input_file, modified_mom6_input_file):
+def test_round_trip_mom6_input(complex_mom6_input_file, modified_mom6_input_file):
     mom6_input_from_file = Mom6Input(file_name=complex_mom6_input_file.file)
     mom6_input_from_file["dt"] = 900.0
     mom6_input_from_file["ADDED_VAR"] = 1
@@ -100,10 +110,33 @@ def test_round_trip_mom6_input(tmp_path, complex_mom6_input_file, modified_mom6_
     mom6_input_from_file["N_SMOOTH"] = 4
     del mom6_input_from_file["TO_BE_REMOVED"]
 
-    write_mom6_input(mom6_input_from_file, tmp_path / "MOM_input_new")
+    output = StringIO()
+    write_mom6_input(mom6_input_from_file, output)
 
     assert mom6_input_from_file["ADDED_VAR"] == 32
-    assert filecmp.cmp(tmp_path / "MOM_input_new", modified_mom6_input_file.file)
+    assert output.getvalue() == modified_mom6_input_file.string
+
+
+def test_write_mom6_input_bare_directive():
+    # A bare "#" line is an incorrect directive applying to the variable declared in the next line
+    mom6_input = Mom6Input(file_name=StringIO("#\ndt_therm = 3600.\n"))
+
+    output = StringIO()
+    write_mom6_input(mom6_input, output)
+
+    assert mom6_input == {"DT_THERM": 3600.0}
+    assert output.getvalue().splitlines()[:2] == ["#", "DT_THERM = 3600."]
+
+
+def test_mom6_input_instances_are_independent(simple_mom6_input_file):
+    mom6_input_1 = Mom6Input(file_name=simple_mom6_input_file.file)
+    mom6_input_2 = Mom6Input(file_name=simple_mom6_input_file.file)
+    del mom6_input_1["DT"]
+
+    assert mom6_input_1._deleted_keys == ["DT"]
+    assert mom6_input_2._deleted_keys == []
+    assert "DT" in mom6_input_2
+    assert mom6_input_1._file_patch is not mom6_input_2._file_patch
 
 
 def test_read_missing_mom6_file():
@@ -1,9 +1,31 @@
 import pytest
-import filecmp
+from io import StringIO
 
 from test_utils import MockFile
 from om3utils.nuopc_config import read_nuopc_config, write_nuopc_config
 
+SIMPLE_NUOPC_CONFIG_STR = """DRIVER_attributes::
+  Verbosity = off
+  cime_model = cesm
+  logFilePostFix = .log
+  pio_blocksize = -1
+  pio_rearr_comm_enable_hs_comp2io = .true.
+  pio_rearr_comm_enable_hs_io2comp = .false.
+  reprosum_diffmax = -1.000000D-08
+  wv_sat_table_spacing = 1.000000D+00
+  wv_sat_transition_start = 2.000000D+01
+::
+
+COMPONENTS: atm ocn
+ALLCOMP_attributes::
+  ATM_model = datm
+  GLC_model = sglc
+  OCN_model = mom
+  ocn2glc_levels = 1:10:19:26:30:33:35
+::
+
+"""
+
 
 @pytest.fixture()
 def simple_nuopc_config():
@@ -32,33 +54,16 @@ def simple_nuopc_config():
 @pytest.fixture()
 def simple_nuopc_config_file(tmp_path):
     file = tmp_path / "simple_config_file"
-    resource_file_str = """DRIVER_attributes::
-  Verbosity = off
-  cime_model = cesm
-  logFilePostFix = .log
-  pio_blocksize = -1
-  pio_rearr_comm_enable_hs_comp2io = .true.
-  pio_rearr_comm_enable_hs_io2comp = .false.
-  reprosum_diffmax = -1.000000D-08
-  wv_sat_table_spacing = 1.000000D+00
-  wv_sat_transition_start = 2.000000D+01
-::
+    return MockFile(SIMPLE_NUOPC_CONFIG_STR, file)
 
-COMPONENTS: atm ocn
-ALLCOMP_attributes::
-  ATM_model = datm
-  GLC_model = sglc
-  OCN_model = mom
-  ocn2glc_levels = 1:10:19:26:30:33:35
-::
 
-"""
-    return MockFile(file, resource_file_str)
+@pytest.fixture()
+def simple_nuopc_config_stream():
+    return MockFile(SIMPLE_NUOPC_CONFIG_STR)
 
 
 @pytest.fixture()
-def invalid_nuopc_config_file(tmp_path):
-    file = tmp_path / "invalid_config_file"
+def invalid_nuopc_config_file():
     resource_file_str = """DRIVER_attributes::
   Verbosity: off
   cime_model - cesm
@@ -66,10 +71,16 @@ def invalid_nuopc_config_file(tmp_path):
 
 COMPONENTS::: atm ocn
 """
-    return MockFile(file, resource_file_str)
+    return MockFile(resource_file_str)
 
 
-def test_read_nuopc_config(tmp_path, simple_nuopc_config, simple_nuopc_config_file):
+def test_read_nuopc_config(simple_nuopc_config, simple_nuopc_config_stream):
+    config_from_file = read_nuopc_config(file_name=simple_nuopc_config_stream.file)
+
+    assert config_from_file == simple_nuopc_config
+
+
+def test_read_nuopc_config_from_disk(simple_nuopc_config, simple_nuopc_config_file):
     config_from_file = read_nuopc_config(file_name=simple_nuopc_config_file.file)
 
     assert config_from_file == simple_nuopc_config
@@ -79,11 +90,31 @@ def test_write_nuopc_config(tmp_path, simple_nuopc_config, simple_nuopc_config_f
     file = tmp_path / "config_file"
     write_nuopc_config(simple_nuopc_config, file)
 
-    assert filecmp.cmp(file, simple_nuopc_config_file.file)
+    assert file.read_text() == simple_nuopc_config_file.string
+
+
+def test_write_nuopc_config_to_stream(simple_nuopc_config):
+    stream = StringIO()
+    write_nuopc_config(simple_nuopc_config, stream)
+
+    assert stream.getvalue() == SIMPLE_NUOPC_CONFIG_STR
+
+
+def test_read_nuopc_config_non_identifier_names():
+    # Names that are not valid identifiers are not handled by the fast path and must be parsed with the regex
+    config_str = """DRIVER_attributes::
+  Verbosity = off
+  1x = 2
+  2d_field=.true.
+::
+"""
+    config = read_nuopc_config(file_name=StringIO(config_str))
+
+    assert config == {"DRIVER_attributes": {"Verbosity": "off", "1x": 2, "2d_field": True}}
 
 
-def test_read_invalid_nuopc_config_file(tmp_path, invalid_nuopc_config_file):
-    with pytest.raises(ValueError):
+def test_read_invalid_nuopc_config_file(invalid_nuopc_config_file):
+    with pytest.raises(ValueError, match="in file <stream> is not a valid"):
         read_nuopc_config(file_name=invalid_nuopc_config_file.file)
 
 
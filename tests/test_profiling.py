@@ -1,24 +1,9 @@
 import numpy as np
 import pytest
-from pathlib import Path
 import xarray as xr
 
-from om3utils.profiling import ProfilingParser, parse_profiling_data
-
-
-class MockProfilingParser(ProfilingParser):
-    def __init__(self, data: dict):
-        super().__init__()
-
-        self._metrics = ["hits", "tmin", "tmax", "tavg"]
-        self._data = data
-
-    @property
-    def metrics(self) -> list:
-        return self._metrics
-
-    def read(self, path: Path) -> dict:
-        return self._data[path.name]
+from test_utils import MockProfilingParser
+from om3utils.profiling import parse_profiling_data
 
 
 @pytest.fixture()
@@ -47,3 +32,29 @@ def test_parse_profiling_data(tmp_path, simple_scaling_runs, simple_scaling_data
     stats = parse_profiling_data(run_dirs, parser, "ncpus", get_ncpus)
 
     assert stats.equals(simple_scaling_data)
+
+
+def test_parse_profiling_data_different_regions(tmp_path):
+    data = {
+        "run_1": dict(region=["a", "b"], hits=[1, 2], tmin=[1.0, 2.0], tmax=[3.0, 4.0], tavg=[2.0, 3.0]),
+        "run_2": dict(region=["c", "a"], hits=[5, 6], tmin=[5.0, 6.0], tmax=[7.0, 8.0], tavg=[6.0, 7.0]),
+    }
+    run_dirs = [(tmp_path / run_name).as_posix() for run_name in data]
+    parser = MockProfilingParser(data)
+
+    def get_ncpus(run_dir):
+        return int(run_dir.name.split("_")[1])
+
+    stats = parse_profiling_data(run_dirs, parser, "ncpus", get_ncpus)
+
+    # Regions are aligned across runs, with NaN for the regions missing from a run
+    expected = xr.Dataset(
+        data_vars=dict(
+            hits=(["ncpus", "region"], [[1, 2, np.nan], [6, np.nan, 5]]),
+            tmin=(["ncpus", "region"], [[1.0, 2.0, np.nan], [6.0, np.nan, 5.0]]),
+            tmax=(["ncpus", "region"], [[3.0, 4.0, np.nan], [8.0, np.nan, 7.0]]),
+            tavg=(["ncpus", "region"], [[2.0, 3.0, np.nan], [7.0, np.nan, 6.0]]),
+        ),
+        coords=dict(region=["a", "b", "c"], ncpus=[1, 2]),
+    )
+    assert stats.equals(expected)
@@ -1,19 +1,91 @@
+import math
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from om3utils.profiling import ProfilingParser
+from om3utils.utils import convert_from_string
+
+
 class MockFile:
     """Class for testing parsers that require a file.
 
+    If a file is given, the contents are written to that file on disk. Otherwise, the file is replaced by an in-memory
+    text stream holding the same contents, which can be passed directly to parsers accepting file-like objects.
+
     Usage:
     @pytest.fixture
     def file_mock(tmp_path):
        file = tmp_path / _file_name
-       return MockFile(file, string_contents)
+       return MockFile(string_contents, file)
     """
 
-    def __init__(self, file, string):
-        # File object
-        self.file = file
+    def __init__(self, string, file=None):
         # File contents
         self.string = string
-        # Name prepended by path
-        self.full_path = self.file.as_posix()
-        # Write file
-        self.file.write_text(self.string)
+        if file is None:
+            # In-memory file object
+            self.file = StringIO(self.string)
+            self.full_path = None
+        else:
+            # File object
+            self.file = file
+            # Name prepended by path
+            self.full_path = self.file.as_posix()
+            # Write file
+            self.file.write_text(self.string)
+
+
+class MockProfilingParser(ProfilingParser):
+    def __init__(self, data: dict):
+        super().__init__()
+
+        self._metrics = ["hits", "tmin", "tmax", "tavg"]
+        self._data = data
+
+    @property
+    def metrics(self) -> list:
+        return self._metrics
+
+    def read(self, path: Path) -> dict:
+        return self._data[path.name]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (".true.", True),
+        (".FALSE.", False),
+        ("8", 8),
+        ("-31", -31),
+        ("1_000", 1000),
+        ("1.5", 1.5),
+        ("1_000.5e-1_0", 1000.5e-10),
+        ("-1.0D-08", -1.0e-08),
+        ("INF", math.inf),
+        ("-Infinity", -math.inf),
+        (" 8", 8),
+        ("31\n", 31),
+        ("0e00\t", 0.0),
+        (" -1.0D-08 ", -1.0e-08),
+        ("1.0d-08", "1.0d-08"),
+        ("1__000", "1__000"),
+        ("1 0", "1 0"),
+        ("cesm", "cesm"),
+        ("", ""),
+    ],
+)
+def test_convert_from_string(value, expected):
+    result = convert_from_string(value)
+
+    assert type(result) is type(expected)
+    assert result == expected
+
+
+@pytest.mark.parametrize("value", ["nan", "-Nan", "NAN", " nan\n"])
+def test_convert_from_string_nan(value):
+    result = convert_from_string(value)
+
+    assert isinstance(result, float)
+    assert math.isnan(result)